@@ -1,4 +1,5 @@
 import json
+import math
 import os
 from typing import List, Tuple
 
@@ -6,6 +7,9 @@ import pandas as pd
 
 from utils.files import iter_lines
 
+# Columnas que añade la ingesta (tipadas); el resto son campos crudos del NDJSON
+META_COLUMNS = {"_source_file", "_ingest_ts", "_batch_id"}
+
 
 def read_ndjson_bronze(path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Lee NDJSON y separa las líneas rotas a 'bad_df'."""
@@ -36,3 +40,32 @@ def read_ndjson_bronze(path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
     df["_batch_id"] = batch_id
     bad_df["_batch_id"] = batch_id
     return df, bad_df
+
+
+def _to_json_text(v):
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return None
+    return json.dumps(v, ensure_ascii=False)
+
+
+def encode_raw_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Campos crudos → texto JSON (string) para persistir BRONCE en Parquet.
+    Sin esto, un campo con tipos distintos entre líneas (p. ej. user_id 42 y "u001")
+    hace fallar a pyarrow; así se conserva el valor y su tipo original.
+    """
+    out = df.copy()
+    for col in out.columns:
+        if col not in META_COLUMNS:
+            out[col] = out[col].map(_to_json_text).astype("string")
+    return out
+
+
+def decode_raw_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Inverso de encode_raw_columns: devuelve los valores con su tipo JSON original."""
+    out = df.copy()
+    for col in out.columns:
+        if col not in META_COLUMNS:
+            out[col] = out[col].map(
+                lambda v: None if pd.isna(v) else json.loads(v)).astype(object)
+    return out
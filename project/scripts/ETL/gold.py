@@ -1,5 +1,7 @@
 # ETL/gold.py
 import hashlib
+from typing import Iterable
+
 import pandas as pd
 
 
@@ -68,6 +70,51 @@ def detect_session_funnel_with_counts(paths: list[str]) -> dict:
         "purchases_in_session": purchases,
     }
 
+
+def safe_div(a, b): return (a / b) if b else 0.0
+
+
+def funnel_counts(sessions: pd.DataFrame) -> list[int]:
+    """Cuenta sesiones por paso del embudo (Sesiones, '/', productos, carrito, checkout)."""
+    return [
+        len(sessions),
+        int(sessions["saw_root"].sum()),
+        int(sessions["saw_productos_after_root"].sum()),
+        int(sessions["saw_carrito_after_productos"].sum()),
+        int(sessions["saw_checkout_after_carrito"].sum()),
+    ]
+
+
+def build_funnel_table(counts: list[int]) -> pd.DataFrame:
+    """Tabla de embudo agregado (count, rate_step, rate_overall) a partir de funnel_counts (sumables entre días)."""
+    total_sessions, s_root, s_prod, s_cart, s_chk = counts
+
+    funnel_table = pd.DataFrame({
+        "step": [
+            "Sesiones", "→ con '/'",
+            "→ luego '/productos'",
+            "→ luego '/carrito'",
+            "→ luego '/checkout' (compra)"
+        ],
+        "count": [total_sessions, s_root, s_prod, s_cart, s_chk],
+    })
+
+    funnel_table["rate_step"] = [
+        1.0,
+        safe_div(s_root, total_sessions),
+        safe_div(s_prod, s_root),
+        safe_div(s_cart, s_prod),
+        safe_div(s_chk,  s_cart),
+    ]
+    funnel_table["rate_overall"] = [
+        1.0,
+        safe_div(s_root, total_sessions),
+        safe_div(s_prod, total_sessions),
+        safe_div(s_cart, total_sessions),
+        safe_div(s_chk,  total_sessions),
+    ]
+    return funnel_table
+
 # 1) MATERIALIZAR: construir events_gold EN MEMORIA (y luego lo guardas en Parquet desde run.py)
 
 
@@ -91,28 +138,37 @@ def build_events_gold(silver: pd.DataFrame, session_timeout_min: int = 30) -> pd
     events_gold = df.drop(columns=["prev_ts"]).copy()
     return events_gold
 
-# 2) AGREGAR: calcular KPIs/tablas ORO leyendo desde events_gold (DataFrame ya cargado del Parquet)
-
 
-def aggregate_from_events_gold(events_gold: pd.DataFrame):
+def build_user_index(events_gold: pd.DataFrame) -> pd.DataFrame:
     """
-    Devuelve:
-      - sessions
-      - users_stats
-      - top_paths
-      - device_usage
-      - sessions_per_day
-      - funnel_table
+    Índice por usuario de events_gold (ya ordenado por user_id, como lo deja build_events_gold):
+    user_id → [row_start, row_end) en el Parquet, más nº de sesiones y primer/último ts.
     """
-    df = events_gold.sort_values(["user_id", "ts"]).copy()
+    df = events_gold[["user_id", "session_id", "ts"]].reset_index(drop=True)
+    df["row"] = df.index
+    index = (
+        df.groupby("user_id", sort=False)
+          .agg(row_start=("row", "min"),
+               row_end=("row", "max"),
+               events=("row", "count"),
+               sessions=("session_id", "nunique"),
+               first_ts=("ts", "min"),
+               last_ts=("ts", "max"))
+          .reset_index()
+    )
+    index["row_end"] += 1
+    if not (index["row_end"] - index["row_start"] == index["events"]).all():
+        raise ValueError(
+            "events_gold no está agrupado por user_id: no se puede indexar")
+    return index.sort_values("user_id").reset_index(drop=True)
+
+
+def build_sessions(events_gold: pd.DataFrame) -> pd.DataFrame:
+    """Tabla de sesiones (una fila por session_id) con flags de embudo y duración."""
+    df = events_gold.sort_values(["session_id", "ts"], kind="stable")
 
     # Flags de embudo por sesión
-    paths_by_session = (
-        df.sort_values("ts")
-          .groupby("session_id")["path"]
-          .apply(list)
-          .to_dict()
-    )
+    paths_by_session = df.groupby("session_id")["path"].apply(list).to_dict()
     flags_rows = []
     for sid, plist in paths_by_session.items():
         flags = detect_session_funnel_with_counts(plist)
@@ -120,11 +176,12 @@ def aggregate_from_events_gold(events_gold: pd.DataFrame):
         flags_rows.append(flags)
     session_flags = pd.DataFrame(flags_rows)
 
-    # Tabla de sesiones
+    # Tabla de sesiones (user_id es opcional: el reporte de rango con sketches no lo lee)
+    user_agg = {"user_id": ("user_id", "first")} if "user_id" in df.columns else {}
     sessions = (
         df.groupby("session_id")
           .agg(
-              user_id=("user_id", "first"),
+              **user_agg,
               date=("date", "first"),
               start_ts=("ts", "min"),
               end_ts=("ts", "max"),
@@ -137,6 +194,24 @@ def aggregate_from_events_gold(events_gold: pd.DataFrame):
     sessions["session_duration_sec"] = (
         sessions["end_ts"] - sessions["start_ts"]
     ).dt.total_seconds().fillna(0)
+    return sessions
+
+# 2) AGREGAR: calcular KPIs/tablas ORO leyendo desde events_gold (DataFrame ya cargado del Parquet)
+
+
+def aggregate_from_events_gold(events_gold: pd.DataFrame):
+    """
+    Devuelve:
+      - sessions
+      - users_stats
+      - top_paths
+      - device_usage
+      - sessions_per_day
+      - funnel_table
+    """
+    df = events_gold.sort_values(["user_id", "ts"]).copy()
+
+    sessions = build_sessions(df)
 
     # Métricas por usuario
     users_sessions = sessions.groupby("user_id").agg(
@@ -174,36 +249,170 @@ def aggregate_from_events_gold(events_gold: pd.DataFrame):
     )
 
     # Embudo agregado
-    total_sessions = len(sessions)
-    s_root = int(sessions["saw_root"].sum())
-    s_prod = int(sessions["saw_productos_after_root"].sum())
-    s_cart = int(sessions["saw_carrito_after_productos"].sum())
-    s_chk = int(sessions["saw_checkout_after_carrito"].sum())
+    funnel_table = build_funnel_table(funnel_counts(sessions))
 
-    funnel_table = pd.DataFrame({
-        "step": [
-            "Sesiones", "→ con '/'",
-            "→ luego '/productos'",
-            "→ luego '/carrito'",
-            "→ luego '/checkout' (compra)"
-        ],
-        "count": [total_sessions, s_root, s_prod, s_cart, s_chk],
-    })
+    return sessions, users_stats, top_paths, device_usage, sessions_per_day, funnel_table
 
-    def safe_div(a, b): return (a / b) if b else 0.0
-    funnel_table["rate_step"] = [
-        1.0,
-        safe_div(s_root, total_sessions),
-        safe_div(s_prod, s_root),
-        safe_div(s_cart, s_prod),
-        safe_div(s_chk,  s_cart),
-    ]
-    funnel_table["rate_overall"] = [
-        1.0,
-        safe_div(s_root, total_sessions),
-        safe_div(s_prod, total_sessions),
-        safe_div(s_cart, total_sessions),
-        safe_div(s_chk,  total_sessions),
-    ]
+# 3) RANGO: agregar varios días leyendo cada events_gold por separado (un día en memoria a la vez)
 
-    return sessions, users_stats, top_paths, device_usage, sessions_per_day, funnel_table
+
+def trend_views(views: pd.Series, path: str, absent_floor: int = 0):
+    """Vistas de `path` en un día; si no se contó (fuera del resumen del sketch) → '≤ cota'."""
+    if path in views.index:
+        return int(views[path])
+    return f"≤{absent_floor}" if absent_floor else 0
+
+
+def aggregate_range_from_events_gold(daily_events_gold: Iterable[tuple[str, pd.DataFrame, dict | None]],
+                                     top_n: int = 10, trend_paths: int = 5, use_sketches: bool = False):
+    """
+    Recibe un iterable de (día, events_gold, sketches del día) con columnas mínimas. De cada día solo se guardan
+    totales sumables (sesiones, páginas, duración, compras, conteos de embudo, vistas por path),
+    nunca las filas de sesiones. Devuelve:
+      - totals (dict: users, sessions, events, pageviews, duration_sec, purchases, days)
+      - top_paths (top N del rango)
+      - top_paths_trend (vistas por día de los `trend_paths` paths más vistos)
+      - device_usage
+      - sessions_per_day (sesiones, usuarios, eventos, compras y conversión por día)
+      - funnel_table (embudo agregado del rango)
+      - funnel_trend (embudo por día)
+      - sketches (fusión de los sketches diarios; None si use_sketches=False)
+    Con use_sketches=True, usuarios (total y por día) y top paths salen de los sketches:
+    no se guarda el conjunto de user_id ni los conteos exactos por path, y events_gold
+    puede venir sin la columna user_id. `totals["users"]` es entonces None.
+    """
+    totals = {"sessions": 0, "events": 0, "pageviews": 0,
+              "duration_sec": 0.0, "purchases": 0, "days": 0}
+    funnel_sum = [0, 0, 0, 0, 0]
+    users = set()
+    path_counts = pd.Series(dtype="int64")
+    device_counts = pd.Series(dtype="int64")
+    views_by_day = {}
+    absent_floor = {}
+    day_rows = []
+    funnel_rows = []
+    merged_sketches = None
+
+    for day, events_gold, day_sketches in daily_events_gold:
+        if events_gold.empty:
+            continue
+        sessions = build_sessions(events_gold)
+        counts = funnel_counts(sessions)
+        total, s_root, s_prod, s_cart, s_chk = counts
+        purchases = int(sessions["purchases_in_session"].sum())
+
+        totals["sessions"] += total
+        totals["events"] += len(events_gold)
+        totals["pageviews"] += int(sessions["pageviews"].sum())
+        totals["duration_sec"] += float(sessions["session_duration_sec"].sum())
+        totals["purchases"] += purchases
+        totals["days"] += 1
+        funnel_sum = [a + b for a, b in zip(funnel_sum, counts)]
+        if use_sketches:
+            # Vistas exactas del día solo para los paths del resumen (no la tabla completa de paths)
+            day_counters = list(day_sketches["paths"].counters)
+            views_by_day[day] = events_gold.loc[
+                events_gold["path"].isin(day_counters), "path"].value_counts()
+            # Un path fuera del resumen del día tuvo como mucho min_count() vistas
+            absent_floor[day] = day_sketches["paths"].min_count()
+            day_users = round(day_sketches["users"].estimate())
+            merged_sketches = merge_gold_sketches(
+                [merged_sketches, day_sketches] if merged_sketches else [day_sketches])
+        else:
+            users.update(events_gold["user_id"].dropna().unique())
+            day_paths = events_gold["path"].value_counts()
+            views_by_day[day] = day_paths
+            path_counts = path_counts.add(day_paths, fill_value=0)
+            day_users = int(events_gold["user_id"].nunique())
+        device_counts = device_counts.add(
+            events_gold["device"].value_counts(dropna=True), fill_value=0)
+
+        day_rows.append({
+            "date": day,
+            "sessions": total,
+            "users_est" if use_sketches else "users": day_users,
+            "events": len(events_gold),
+            "purchases": purchases,
+            "conversion": safe_div(s_chk, total),
+        })
+        funnel_rows.append({
+            "date": day,
+            "sessions": total,
+            "con '/'": s_root,
+            "'/productos'": s_prod,
+            "'/carrito'": s_cart,
+            "'/checkout'": s_chk,
+            "rate_overall": safe_div(s_chk, total),
+        })
+
+    totals["users"] = None if use_sketches else len(users)
+
+    if use_sketches:
+        top_paths = (merged_sketches["paths"].top(top_n) if merged_sketches
+                     else pd.DataFrame(columns=["path", "views_est", "error_max", "views_min"]))
+    else:
+        top_paths = (
+            path_counts.astype("int64")
+            .sort_values(ascending=False, kind="stable")
+            .rename_axis("path")
+            .reset_index(name="views")
+            .head(top_n)
+        )
+
+    trend_cols = list(top_paths["path"].head(trend_paths))
+    top_paths_trend = pd.DataFrame(
+        [{"date": day, **{p: trend_views(views, p, absent_floor.get(day, 0)) for p in trend_cols}}
+         for day, views in sorted(views_by_day.items())]
+    )
+
+    device_usage = (
+        device_counts.astype("int64")
+        .sort_values(ascending=False, kind="stable")
+        .rename_axis("device")
+        .reset_index(name="events")
+    )
+
+    sessions_per_day = pd.DataFrame(day_rows)
+    funnel_trend = pd.DataFrame(funnel_rows)
+    funnel_table = build_funnel_table(
+        funnel_sum) if totals["sessions"] else pd.DataFrame()
+
+    return (totals, top_paths, top_paths_trend, device_usage,
+            sessions_per_day, funnel_table, funnel_trend, merged_sketches)
+
+# 4) SKETCHES: resúmenes aproximados por día (usuarios, sesiones, top paths) fusionables entre días
+
+
+def build_gold_sketches(events_gold: pd.DataFrame, hll_p: int = 12, top_k: int = 64) -> dict:
+    """Devuelve {'users': HLL, 'sessions': HLL, 'paths': SpaceSaving} de un events_gold."""
+    from utils.sketches import HyperLogLog, SpaceSaving
+    return {
+        "users": HyperLogLog(hll_p).update(events_gold["user_id"]),
+        "sessions": HyperLogLog(hll_p).update(events_gold["session_id"]),
+        "paths": SpaceSaving(top_k).update(events_gold["path"]),
+    }
+
+
+def merge_gold_sketches(daily_sketches: Iterable[dict]) -> dict | None:
+    """Fusiona los sketches de varios días; None si no hay ninguno."""
+    merged = None
+    for sk in daily_sketches:
+        if merged is None:
+            merged = sk
+            continue
+        for name in ("users", "sessions", "paths"):
+            merged[name].merge(sk[name])
+    return merged
+
+
+def sketches_to_dict(sketches: dict) -> dict:
+    return {name: sk.to_dict() for name, sk in sketches.items()}
+
+
+def sketches_from_dict(data: dict) -> dict:
+    from utils.sketches import HyperLogLog, SpaceSaving
+    return {
+        "users": HyperLogLog.from_dict(data["users"]),
+        "sessions": HyperLogLog.from_dict(data["sessions"]),
+        "paths": SpaceSaving.from_dict(data["paths"]),
+    }
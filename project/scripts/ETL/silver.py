@@ -4,8 +4,8 @@ from utils.files import write_parquet
 from utils.normalizes import normalize_device, normalize_referrer, normalize_path, normalize_string
 
 
-def to_silver(df: pd.DataFrame, day: str, quarantine_dir: str) -> pd.DataFrame:
-    """Limpieza y normalización; los registros inválidos van a cuarentena."""
+def to_silver(df: pd.DataFrame, day: str, quarantine_dir: str, writer=None) -> pd.DataFrame:
+    """Limpieza y normalización; los registros inválidos van a cuarentena (vía `writer` si se da)."""
     out = df.copy()
 
     out["ts"] = pd.to_datetime(out["ts"], errors="coerce", utc=True)
@@ -24,7 +24,7 @@ def to_silver(df: pd.DataFrame, day: str, quarantine_dir: str) -> pd.DataFrame:
                 invalid["_error"] = "ts"
 
                 write_parquet(
-                    invalid, f"{quarantine_dir}/{day}", f"error_{key}.parquet")
+                    invalid, f"{quarantine_dir}/{day}", f"error_{key}.parquet", writer=writer)
                 print(
                     f"[WARN] {len(invalid)} filas inválidas enviadas a → {quarantine_dir}/{day}/error_{key}.parquet")
 
@@ -37,7 +37,7 @@ def to_silver(df: pd.DataFrame, day: str, quarantine_dir: str) -> pd.DataFrame:
     if not invalid_day.empty:
         invalid_day["_error"] = "outside_day"
         write_parquet(
-            invalid_day, f"{quarantine_dir}/{day}", "error_out_ts.parquet")
+            invalid_day, f"{quarantine_dir}/{day}", "error_out_ts.parquet", writer=writer)
 
         print(
             f"[WARN] {len(invalid_day)} filas inválidas enviadas a → {quarantine_dir}/{day}/error_out_ts.parquet")
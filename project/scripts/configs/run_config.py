@@ -3,11 +3,26 @@ import datetime
 
 DAY = datetime.date.today().isoformat()
 BRONZE_DIR = "data/drops/"
+BRONZE_OUT_DIR = "output/bronze"
 SILVER_DIR = "output/silver"
 GOLD_DIR = "output/gold"
 QUARANTINE_DIR = "output/quarantine"
 REPORT_DIR = "output/reports"
 SESSION_TIMEOUT_MIN = 30
+WRITER_THREADS = 4
 FILE_SILVER_NAME = "events_silver.parquet"
 FILE_GOLD_NAME = "events_gold.parquet"
 FILE_BRONZE_NAME = "events.ndjson"
+FILE_BRONZE_PARQUET_NAME = "events_bronze.parquet"
+FILE_BAD_JSON_NAME = "No_JSON_lines.parquet"
+FILE_SKETCHES_NAME = "sketches.json"
+FILE_GOLD_USER_INDEX_NAME = "events_gold_user_index.parquet"
+# ORO se escribe ordenado por user_id; row groups pequeños = lookups por usuario más baratos
+GOLD_ROW_GROUP_SIZE = 10_000
+SKETCH_HLL_P = 12
+SKETCH_TOP_K = 64
+# Columnas mínimas de events_gold que necesita el reporte de rango
+GOLD_REPORT_COLUMNS = ["session_id", "user_id",
+                       "date", "ts", "path", "device"]
+# Con sketches, usuarios salen del HLL: no hace falta leer user_id
+GOLD_SKETCH_REPORT_COLUMNS = ["session_id", "date", "ts", "path", "device"]
@@ -0,0 +1,114 @@
+# lookup_user.py · sesiones y eventos de un usuario en un rango de días, vía índice de ORO
+import argparse
+import datetime
+import sys
+
+from configs.run_config import (
+    DAY, FILE_GOLD_NAME, FILE_GOLD_USER_INDEX_NAME, GOLD_DIR
+)
+from utils.files import read_parquet, read_parquet_rows
+
+EVENT_COLUMNS = ["ts", "date", "session_id",
+                 "user_id", "path", "referrer", "device"]
+
+
+def days_back(end: str, start: str | None, days: int) -> list[str]:
+    end_d = datetime.date.fromisoformat(end)
+    start_d = (datetime.date.fromisoformat(start) if start
+               else end_d - datetime.timedelta(days=days - 1))
+    return [(start_d + datetime.timedelta(days=i)).isoformat()
+            for i in range((end_d - start_d).days + 1)]
+
+
+def lookup_user_day(gold_dir: str, day: str, user_id: str):
+    """
+    Eventos de `user_id` en un día: busca su rango de filas en el índice (filtro con
+    estadísticas de row group) y lee solo los row groups de ORO que lo contienen.
+    Devuelve None si el día no tiene índice.
+    """
+    entry = read_parquet(f"{gold_dir}/{day}", FILE_GOLD_USER_INDEX_NAME,
+                         columns=["row_start", "row_end"],
+                         filters=[("user_id", "==", user_id)])
+    if entry is None:
+        return None
+    if entry.empty:
+        # Usuario ausente ese día: no hace falta abrir events_gold.parquet
+        import pandas as pd
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+
+    row_start, row_end = int(entry["row_start"].iloc[0]), int(entry["row_end"].iloc[0])
+    events = read_parquet_rows(f"{gold_dir}/{day}", FILE_GOLD_NAME, row_start, row_end,
+                               columns=EVENT_COLUMNS)
+    if events is None or not (events["user_id"] == user_id).all():
+        raise ValueError(
+            f"Índice desactualizado para {day}: vuelve a ejecutar `run.py gold --day {day}`")
+    return events
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Sesiones y eventos de un usuario leyendo el índice por usuario de ORO")
+    ap.add_argument("user_id")
+    ap.add_argument("--end", default=DAY)
+    ap.add_argument("--start", help="Primer día (por defecto: --end menos --days)")
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--gold", default=GOLD_DIR)
+    ap.add_argument("--table", choices=["all", "sessions", "events"], default="all",
+                    help="Tabla a mostrar (con --format csv hay que elegir una)")
+    ap.add_argument("--format", choices=["md", "csv"], default="md")
+    args = ap.parse_args()
+
+    if args.start and args.start > args.end:
+        ap.error(f"Rango vacío: {args.start} → {args.end}")
+    if args.days < 1:
+        ap.error("--days debe ser >= 1")
+    if args.format == "csv" and args.table == "all":
+        ap.error("--format csv emite una sola tabla: usa --table sessions o --table events")
+
+    import pandas as pd
+
+    user_id = args.user_id.strip().lower()   # como normalize_string en PLATA
+    parts, missing = [], []
+    for day in days_back(args.end, args.start, args.days):
+        try:
+            events = lookup_user_day(args.gold, day, user_id)
+        except ValueError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            sys.exit(2)
+        if events is None:
+            missing.append(day)
+        elif not events.empty:
+            parts.append(events)
+    if missing:
+        print(f"[WARN] Días sin índice de ORO: {', '.join(missing)}",
+              file=sys.stderr)
+
+    events = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+        columns=EVENT_COLUMNS)
+    sessions = (
+        events.groupby("session_id")
+              .agg(date=("date", "first"),
+                   start_ts=("ts", "min"),
+                   end_ts=("ts", "max"),
+                   pageviews=("path", "count"),
+                   device_first=("device", "first"))
+              .reset_index()
+              .sort_values("start_ts")
+    )
+
+    tables = []
+    if args.table in ("all", "sessions"):
+        tables.append(("Sesiones", sessions))
+    if args.table in ("all", "events"):
+        tables.append(("Eventos", events.drop(columns=["user_id"])))
+    for title, df in tables:
+        if args.format == "csv":
+            print(df.to_csv(index=False), end="")
+        else:
+            print(f"## {title} · {user_id}")
+            print(df.to_markdown(index=False) if not df.empty else "_(sin datos)_")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# query.py · SQL ad-hoc (DuckDB en proceso) sobre PLATA / ORO / cuarentena
+import argparse
+import sys
+
+import duckdb
+import pandas as pd
+
+from configs.run_config import (
+    FILE_GOLD_NAME, FILE_SILVER_NAME, GOLD_DIR, QUARANTINE_DIR, SILVER_DIR
+)
+from utils.files import make_path_dirs
+
+
+def partition_files(base_dir: str, file_name: str, start: str | None, end: str | None) -> list[str]:
+    """
+    Ficheros `<base_dir>/<día>/<file_name>` cuyo día cae en [start, end].
+    El filtrado por día se hace aquí (poda de particiones), así DuckDB no abre los demás.
+    """
+    base = make_path_dirs(base_dir)
+    if not base.is_dir():
+        return []
+    files = []
+    for day_dir in sorted(p for p in base.iterdir() if p.is_dir()):
+        day = day_dir.name
+        if (start and day < start) or (end and day > end):
+            continue
+        files.extend(str(f) for f in sorted(day_dir.glob(file_name)))
+    return files
+
+
+def register_table(con: duckdb.DuckDBPyConnection, name: str, files: list[str],
+                   schema_files: list[str] | None = None) -> bool:
+    """
+    Crea la vista `name` sobre los Parquet dados, con columna `day` sacada de la ruta.
+    Sin ficheros en el rango, la vista queda vacía con el esquema de `schema_files`
+    (los de cualquier día): la consulta devuelve 0 filas en vez de fallar.
+    Devuelve False si no hay ningún fichero del que sacar el esquema (vista sin crear).
+    """
+    source, limit = files, ""
+    if not files:
+        if not schema_files:
+            return False
+        source, limit = schema_files, "LIMIT 0"
+    file_list = ", ".join("'" + f.replace("'", "''") + "'" for f in source)
+    con.execute(f"""
+        CREATE OR REPLACE VIEW {name} AS
+        SELECT * EXCLUDE (filename),
+               regexp_extract(filename, '(\\d{{4}}-\\d{{2}}-\\d{{2}})[/\\\\][^/\\\\]+$', 1) AS day
+        FROM read_parquet([{file_list}], union_by_name = true, filename = true)
+        {limit}
+    """)
+    return True
+
+
+def connect(silver_dir: str = SILVER_DIR, gold_dir: str = GOLD_DIR,
+            quarantine_dir: str = QUARANTINE_DIR,
+            start: str | None = None, end: str | None = None,
+            missing_tables: list[str] | None = None) -> duckdb.DuckDBPyConnection:
+    """
+    Conexión DuckDB en memoria con las vistas `silver`, `gold` y `quarantine`.
+    Apunta en `missing_tables` las que no tienen ningún Parquet (ni fuera del rango).
+    """
+    con = duckdb.connect(database=":memory:")
+    for name, base_dir, file_name in (("silver", silver_dir, FILE_SILVER_NAME),
+                                      ("gold", gold_dir, FILE_GOLD_NAME),
+                                      ("quarantine", quarantine_dir, "*.parquet")):
+        files = partition_files(base_dir, file_name, start, end)
+        # Solo para el esquema de la vista vacía: cualquier día vale
+        schema_files = [] if files else partition_files(base_dir, file_name, None, None)
+        if not register_table(con, name, files, schema_files) and missing_tables is not None:
+            missing_tables.append(name)
+    return con
+
+
+def run_query(con: duckdb.DuckDBPyConnection, sql: str) -> pd.DataFrame:
+    return con.execute(sql).df()
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="SQL ad-hoc sobre PLATA/ORO/cuarentena (tablas: silver, gold, quarantine)")
+    ap.add_argument("sql", nargs="?",
+                    help="Consulta SQL (o usa --file)")
+    ap.add_argument("--file", help="Fichero .sql con la consulta")
+    ap.add_argument("--start", help="Primer día (YYYY-MM-DD) a incluir")
+    ap.add_argument("--end", help="Último día (YYYY-MM-DD) a incluir")
+    ap.add_argument("--silver", default=SILVER_DIR)
+    ap.add_argument("--gold", default=GOLD_DIR)
+    ap.add_argument("--quarantine", default=QUARANTINE_DIR)
+    ap.add_argument("--format", choices=["md", "csv"], default="md")
+    args = ap.parse_args()
+
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as fh:
+            sql = fh.read()
+    elif args.sql:
+        sql = args.sql
+    else:
+        ap.error("Falta la consulta SQL (argumento o --file)")
+
+    missing_tables: list[str] = []
+    con = connect(args.silver, args.gold, args.quarantine,
+                  start=args.start, end=args.end, missing_tables=missing_tables)
+    try:
+        result = run_query(con, sql)
+    except duckdb.CatalogException as e:
+        missing = [t for t in missing_tables if f"name {t} does not exist" in str(e)]
+        if not missing:
+            print(f"[ERROR] Consulta fallida: {e}", file=sys.stderr)
+            sys.exit(2)
+        dirs = {"silver": args.silver, "gold": args.gold, "quarantine": args.quarantine}
+        for t in missing:
+            print(f"[ERROR] Tabla '{t}' sin ningún Parquet en {dirs[t]} "
+                  f"(rango --start {args.start or '-'} --end {args.end or '-'})", file=sys.stderr)
+        sys.exit(2)
+    except duckdb.Error as e:
+        print(f"[ERROR] Consulta fallida: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.format == "csv":
+        print(result.to_csv(index=False), end="")
+    else:
+        print(result.to_markdown(index=False) if not result.empty else "_(sin datos)_")
+
+
+if __name__ == "__main__":
+    main()
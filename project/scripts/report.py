@@ -5,41 +5,78 @@ import pandas as pd
 from configs.run_config import FILE_GOLD_NAME, FILE_SILVER_NAME, SILVER_DIR
 
 
+def df_to_md(df: pd.DataFrame) -> str:
+    """Tabla Markdown o marcador de 'sin datos'."""
+    return df.to_markdown(index=False) if (isinstance(
+        df, pd.DataFrame) and not df.empty) else "_(sin datos)_"
+
+
+def sketches_md(sketches: dict | None, rebuilt_days: list[str] | None = None,
+                show_top: bool = True) -> str:
+    """Sección de aproximaciones (HLL / Space-Saving) con sus cotas de error."""
+    if not sketches:
+        return ""
+    users, sessions, paths = sketches["users"], sketches["sessions"], sketches["paths"]
+    users_est, sessions_est = users.estimate(), sessions.estimate()
+    rebuilt_md = (f"- **Sketches reconstruidos desde ORO (sin sketches.json):** {', '.join(rebuilt_days)}\n"
+                  if rebuilt_days else "")
+    top_md = f"\n{df_to_md(paths.top(10))}\n" if show_top else ""
+    return (
+        "## 9. Aproximaciones (sketches)\n"
+        f"- **Usuarios únicos (HLL):** ≈ {users_est:.0f} ± {users_est * users.relative_error * 2:.0f} "
+        f"(95%, error relativo σ={users.relative_error:.2%})\n"
+        f"- **Sesiones (HLL):** ≈ {sessions_est:.0f} ± {sessions_est * sessions.relative_error * 2:.0f} "
+        f"(95%, error relativo σ={sessions.relative_error:.2%})\n"
+        f"- **Top páginas (Space-Saving, k={paths.k}):** real ∈ [views_min, views_est]; "
+        f"paths fuera del resumen ≤ {paths.max_error} vistas\n"
+        f"{rebuilt_md}"
+        f"{top_md}"
+    )
+
+
 def build_report_md(args: Namespace,
-                    bronze_df: pd.DataFrame,
-                    bad_df: pd.DataFrame,
+                    bronze_rows: int | None,
+                    bad_json_rows: int,
                     gold: pd.DataFrame,
                     sessions: pd.DataFrame,
                     users_stats: pd.DataFrame,
                     top_paths: pd.DataFrame,
                     device_usage: pd.DataFrame,
                     sessions_per_day: pd.DataFrame,
-                    funnel: pd.DataFrame) -> str:
-    """Devuelve el texto Markdown del reporte final."""
+                    funnel: pd.DataFrame,
+                    sketches: dict | None = None,
+                    sketch_rebuilt: bool = False) -> str:
+    """Devuelve el texto Markdown del reporte final (usuarios únicos desde HLL si hay sketches)."""
 
     gen_ts = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
     total_sessions = len(sessions)
     total_purchases = int(sessions.get("purchases_in_session", pd.Series(
         dtype=int)).sum()) if "purchases_in_session" in sessions.columns else 0
-    uniq_users = int(gold["user_id"].nunique()) if not gold.empty else 0
+    if sketches:
+        uniq_users = f"≈{sketches['users'].estimate():.0f}"
+    else:
+        uniq_users = int(gold["user_id"].nunique()) if not gold.empty else 0
     avg_pages_per_session = float(sessions["pageviews"].mean(
     )) if "pageviews" in sessions.columns and not sessions.empty else 0.0
     avg_session_min = float(sessions["session_duration_sec"].mean(
     ) / 60.0) if "session_duration_sec" in sessions.columns and not sessions.empty else 0.0
 
-    top_paths_md = top_paths.to_markdown(index=False) if (isinstance(
-        top_paths, pd.DataFrame) and not top_paths.empty) else "_(sin datos)_"
-    device_usage_md = device_usage.to_markdown(index=False) if (isinstance(
-        device_usage, pd.DataFrame) and not device_usage.empty) else "_(sin datos)_"
-    sessions_per_day_md = sessions_per_day.to_markdown(index=False) if (isinstance(
-        sessions_per_day, pd.DataFrame) and not sessions_per_day.empty) else "_(sin datos)_"
-    funnel_md = funnel.to_markdown(index=False) if (isinstance(
-        funnel, pd.DataFrame) and not funnel.empty) else "_(sin datos)_"
+    top_paths_md = df_to_md(top_paths)
+    device_usage_md = df_to_md(device_usage)
+    sessions_per_day_md = df_to_md(sessions_per_day)
+    funnel_md = df_to_md(funnel)
 
-    bronze_rows = len(bronze_df)
     silver_rows = len(gold)
-    bad_json_rows = len(bad_df)
+    # bronze_rows=None: no hay events_bronze.parquet (días previos o escritura fallida)
+    if bronze_rows is None:
+        bronze_rows_md = "n/d (falta events_bronze.parquet)"
+        bronze_diff_md = coverage_md = "n/d"
+    else:
+        bronze_rows_md = str(bronze_rows)
+        bronze_diff_md = str(bronze_rows - silver_rows)
+        coverage = (silver_rows / (bronze_rows + bad_json_rows) * 100.0) if bronze_rows > 0 else 0.0
+        coverage_md = f"{coverage:.2f}%"
 
     report = (
         "# Reporte · Web Logs (BRONCE → PLATA → ORO)\n"
@@ -62,14 +99,102 @@ def build_report_md(args: Namespace,
         "## 6. Embudo por sesión\n"
         f"{funnel_md}\n\n"
         "## 7. Calidad y cobertura\n"
-        f"- Filas BRONCE: {bronze_rows}\n"
+        f"- Filas BRONCE: {bronze_rows_md}\n"
         f"- Filas PLATA: {silver_rows}\n"
         f"- Líneas rotas (JSON) a cuarentena: {bad_json_rows}\n"
-        f"- Diferencia BRONCE→PLATA (drops/dedupe/fuera de día): {bronze_rows - silver_rows}\n\n"
-        f"- Porcentaje de cobertura PLATA/BRONCE:  {(silver_rows/(bronze_rows+bad_json_rows)*100.0) if bronze_rows > 0 else 0.0:.2f}%\n\n"
+        f"- Diferencia BRONCE→PLATA (drops/dedupe/fuera de día): {bronze_diff_md}\n\n"
+        f"- Porcentaje de cobertura PLATA/BRONCE:  {coverage_md}\n\n"
         "## 8. Persistencia\n"
         f"- Parquet PLATA: `{args.gold}/{args.day}/{FILE_SILVER_NAME}`\n"
         f"- Parquet ORO: `{args.silver}/{args.day}/{FILE_GOLD_NAME}`\n"
         f"- Reporte: `{args.report}/{args.day}-reporte.md`\n"
     )
+    if sketches:
+        report += "\n" + sketches_md(sketches,
+                                     rebuilt_days=[args.day] if sketch_rebuilt else None)
+    return report
+
+
+def build_range_report_md(args: Namespace,
+                          days: list[str],
+                          missing_days: list[str],
+                          totals: dict,
+                          top_paths: pd.DataFrame,
+                          top_paths_trend: pd.DataFrame,
+                          device_usage: pd.DataFrame,
+                          sessions_per_day: pd.DataFrame,
+                          funnel: pd.DataFrame,
+                          funnel_trend: pd.DataFrame,
+                          sketches: dict | None = None,
+                          sketch_rebuilt_days: list[str] | None = None) -> str:
+    """
+    Devuelve el texto Markdown del reporte de un rango de días (tendencias).
+    Con sketches, usuarios y top páginas son aproximados (HLL / Space-Saving).
+    """
+
+    gen_ts = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    # Medias desde totales sumados día a día (sin filas de sesiones)
+    total_sessions = totals["sessions"]
+    total_purchases = totals["purchases"]
+    total_events = totals["events"]
+    avg_pages_per_session = (
+        totals["pageviews"] / total_sessions) if total_sessions else 0.0
+    avg_session_min = (
+        totals["duration_sec"] / total_sessions / 60.0) if total_sessions else 0.0
+    days_with_data = len(days) - len(missing_days)
+    avg_sessions_per_day = (
+        total_sessions / days_with_data) if days_with_data else 0.0
+
+    uniq_users = totals["users"]
+    if uniq_users is None:
+        uniq_users = f"≈{sketches['users'].estimate():.0f}" if sketches else "n/d"
+
+    missing_md = ", ".join(missing_days) if missing_days else "ninguno"
+    top_title = "Top 10 páginas (Space-Saving, aprox.)" if sketches else "Top 10 páginas"
+    trend_title = ("Top páginas por día (vistas exactas; '≤N' = fuera del resumen Space-Saving del día)"
+                   if sketches else "Top páginas por día")
+    sketch_coverage_md = ""
+    if sketches:
+        rebuilt_md = ", ".join(
+            sketch_rebuilt_days) if sketch_rebuilt_days else "ninguno"
+        sketch_coverage_md = f"- Días sin sketches.json (reconstruidos desde ORO): {rebuilt_md}\n"
+
+    report = (
+        "# Reporte · Web Logs (BRONCE → PLATA → ORO) · Rango\n"
+        f"**Rango:** {args.start} → {args.end} · **Fuente:** {FILE_GOLD_NAME} · **Generado:** {gen_ts}\n\n"
+        "## 1. Titular\n"
+        f"Usuarios únicos {uniq_users}; sesiones {total_sessions}; compras {total_purchases} en {days_with_data} días.\n\n"
+        "## 2. KPIs\n"
+        f"- **Usuarios únicos:** {uniq_users}\n"
+        f"- **Sesiones:** {total_sessions}\n"
+        f"- **Sesiones por día (media):** {avg_sessions_per_day:.2f}\n"
+        f"- **Compras (checkouts):** {total_purchases}\n"
+        f"- **Eventos (oro):** {total_events}\n"
+        f"- **Páginas por sesión (media):** {avg_pages_per_session:.2f}\n"
+        f"- **Duración media sesión (min):** {avg_session_min:.2f}\n\n"
+        f"## 3. {top_title}\n"
+        f"{df_to_md(top_paths)}\n\n"
+        "## 4. Uso de dispositivos (por eventos)\n"
+        f"{df_to_md(device_usage)}\n\n"
+        "## 5. Sesiones por día\n"
+        f"{df_to_md(sessions_per_day)}\n\n"
+        "## 6. Embudo por sesión\n"
+        f"{df_to_md(funnel)}\n\n"
+        "### Embudo por día\n"
+        f"{df_to_md(funnel_trend)}\n\n"
+        f"### {trend_title}\n"
+        f"{df_to_md(top_paths_trend)}\n\n"
+        "## 7. Calidad y cobertura\n"
+        f"- Días en el rango: {len(days)}\n"
+        f"- Días con ORO: {days_with_data}\n"
+        f"- Días sin ORO: {missing_md}\n"
+        f"{sketch_coverage_md}\n"
+        "## 8. Persistencia\n"
+        f"- Parquet ORO: `{args.gold}/<día>/{FILE_GOLD_NAME}`\n"
+        f"- Reporte: `{args.report}/{args.start}_{args.end}-reporte.md`\n"
+    )
+    if sketches:
+        report += "\n" + sketches_md(sketches, rebuilt_days=sketch_rebuilt_days,
+                                     show_top=False)
     return report
@@ -0,0 +1,89 @@
+# report_range.py · reporte de tendencias sobre varios días de ORO
+import argparse
+import pandas as pd
+
+from ETL.gold import (
+    aggregate_range_from_events_gold, build_gold_sketches, sketches_from_dict
+)
+from report import build_range_report_md
+from configs.run_config import (
+    DAY, FILE_GOLD_NAME, FILE_SKETCHES_NAME, GOLD_DIR, GOLD_REPORT_COLUMNS,
+    GOLD_SKETCH_REPORT_COLUMNS, REPORT_DIR, SKETCH_HLL_P, SKETCH_TOP_K
+)
+from utils.files import read_json, read_parquet, write_file
+
+
+def days_in_range(start: str, end: str) -> list[str]:
+    return list(pd.date_range(start, end, freq="D").strftime("%Y-%m-%d"))
+
+
+def iter_events_gold(gold_dir: str, days: list[str], missing_days: list[str],
+                     use_sketches: bool = False, rebuilt_days: list[str] | None = None):
+    """
+    Lee events_gold día a día (solo columnas necesarias) → (día, df, sketches | None).
+    Apunta los días sin fichero en `missing_days`. Con sketches, un día con ORO pero sin
+    sketches.json se lee completo y su sketch se reconstruye aquí (apuntado en `rebuilt_days`).
+    """
+    for day in days:
+        data = read_json(f"{gold_dir}/{day}",
+                         FILE_SKETCHES_NAME) if use_sketches else None
+        columns = GOLD_SKETCH_REPORT_COLUMNS if data else GOLD_REPORT_COLUMNS
+        df = read_parquet(f"{gold_dir}/{day}", FILE_GOLD_NAME, columns=columns)
+        if df is None:
+            missing_days.append(day)
+            print(
+                f"[WARN] Sin ORO para {day} → {gold_dir}/{day}/{FILE_GOLD_NAME}")
+            continue
+        if not use_sketches:
+            yield day, df, None
+        elif data:
+            yield day, df, sketches_from_dict(data)
+        else:
+            print(
+                f"[WARN] Sin sketches para {day}: reconstruido desde {gold_dir}/{day}/{FILE_GOLD_NAME}")
+            rebuilt_days.append(day)
+            yield day, df, build_gold_sketches(df, hll_p=SKETCH_HLL_P, top_k=SKETCH_TOP_K)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Reporte Markdown de un rango de días leyendo ORO ya materializado")
+    ap.add_argument("--start", default=DAY)
+    ap.add_argument("--end", default=DAY)
+    ap.add_argument("--gold", default=GOLD_DIR)
+    ap.add_argument("--report", default=REPORT_DIR)
+    ap.add_argument("--sketches", action="store_true",
+                    help="Usuarios únicos y top páginas desde sketches fusionados (aproximado)")
+    args = ap.parse_args()
+
+    days = days_in_range(args.start, args.end)
+    if not days:
+        ap.error(f"Rango vacío: {args.start} → {args.end}")
+
+    missing_days: list[str] = []
+    rebuilt_days: list[str] = []
+    (totals,
+     top_paths,
+     top_paths_trend,
+     device_usage,
+     sessions_per_day,
+     funnel,
+     funnel_trend,
+     sketches) = aggregate_range_from_events_gold(
+        iter_events_gold(args.gold, days, missing_days,
+                         use_sketches=args.sketches, rebuilt_days=rebuilt_days),
+        use_sketches=args.sketches)
+
+    report_md = build_range_report_md(args, days, missing_days, totals,
+                                      top_paths, top_paths_trend,
+                                      device_usage, sessions_per_day, funnel,
+                                      funnel_trend, sketches=sketches,
+                                      sketch_rebuilt_days=rebuilt_days)
+
+    write_file(args.report, f"{args.start}_{args.end}-reporte.md", report_md)
+    print(
+        f"[OK] Reporte de rango generado → {args.report}/{args.start}_{args.end}-reporte.md")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,116 @@
-# run.py (fragmentos relevantes)
+# run.py · subcomandos bronze / silver / gold / report / all
+# Cada etapa importa solo lo que necesita (pandas, pyarrow, ETL, tabulate...) dentro de su función:
+# arrancar el CLI cuesta lo mismo que importar argparse.
 import argparse
-import pandas as pd
+import sys
 
-from ETL.gold import build_events_gold, aggregate_from_events_gold
-from ETL.bronze import read_ndjson_bronze
-from ETL.silver import to_silver
-from report import build_report_md
 from configs.run_config import (
-    BRONZE_DIR, DAY, FILE_BRONZE_NAME, FILE_GOLD_NAME, FILE_SILVER_NAME,
-    GOLD_DIR, QUARANTINE_DIR, REPORT_DIR, SILVER_DIR
+    BRONZE_DIR, BRONZE_OUT_DIR, DAY, FILE_BAD_JSON_NAME, FILE_BRONZE_NAME,
+    FILE_BRONZE_PARQUET_NAME, FILE_GOLD_NAME, FILE_GOLD_USER_INDEX_NAME,
+    FILE_SILVER_NAME, FILE_SKETCHES_NAME, GOLD_DIR, GOLD_ROW_GROUP_SIZE, QUARANTINE_DIR, REPORT_DIR,
+    SESSION_TIMEOUT_MIN, SILVER_DIR, SKETCH_HLL_P, SKETCH_TOP_K, WRITER_THREADS
 )
-from utils.files import write_file, write_parquet
 
+STAGES = ["bronze", "silver", "gold", "report", "all"]
 
-def main():
-    ap = argparse.ArgumentParser(
-        description="BRONCE→PLATA→ORO + Reporte Markdown (simple)")
-    ap.add_argument("--day", default=DAY)
-    ap.add_argument("--bronze", default=BRONZE_DIR)
-    ap.add_argument("--bronze-file-name", default=FILE_BRONZE_NAME)
-    ap.add_argument("--silver", default=SILVER_DIR)
-    ap.add_argument("--gold", default=GOLD_DIR)
-    ap.add_argument("--report", default=REPORT_DIR)
-    ap.add_argument("--quarantine", default=QUARANTINE_DIR)
-    args = ap.parse_args()
-
-    # ---- BRONCE ----
-    path = f"{args.bronze}{args.day}/events.ndjson"
+
+def write_status(writer) -> str:
+    """Con writer la escritura solo está encolada: el OK de disco llega tras writer.flush()."""
+    return "escritura encolada" if writer is not None else "guardado en disco"
+
+
+def run_bronze(args, writer=None):
+    """BRONCE: NDJSON → events_bronze.parquet (+ líneas rotas a cuarentena)."""
+    from ETL.bronze import encode_raw_columns, read_ndjson_bronze
+    from utils.files import write_parquet
+
+    path = f"{args.bronze}{args.day}/{args.bronze_file_name}"
     bronze_df, bad_df = read_ndjson_bronze(path)
     if len(bad_df) > 0:
         write_parquet(
-            bad_df, f"{args.quarantine}/{args.day}", "No_JSON_lines.parquet")
-    print(f"[OK] BRONCE leído y cuarentena escrita. Fichero: {path}" +
+            bad_df, f"{args.quarantine}/{args.day}", FILE_BAD_JSON_NAME, writer=writer)
+    # Campos crudos como texto JSON: un tipo distinto entre líneas no rompe el Parquet
+    write_parquet(encode_raw_columns(bronze_df), f"{args.bronze_out}/{args.day}",
+                  FILE_BRONZE_PARQUET_NAME, writer=writer)
+    print(f"[OK] BRONCE leído ({write_status(writer)}, con cuarentena). Fichero: {path}" +
           (f" ({len(bad_df)} líneas rotas)" if len(bad_df) else ""))
+    return bronze_df
+
+
+def run_silver(args, bronze_df=None, writer=None):
+    """PLATA: limpieza desde BRONCE (en memoria o releído de events_bronze.parquet)."""
+    from ETL.bronze import decode_raw_columns
+    from ETL.silver import to_silver
+    from utils.files import read_parquet, write_parquet
 
-    # ---- PLATA ----
-    silver = to_silver(bronze_df, day=args.day, quarantine_dir=args.quarantine)
-    write_parquet(silver,  f"{args.silver}/{args.day}", FILE_SILVER_NAME)
-    print("[OK] PLATA generada y guardada")
+    if bronze_df is None:
+        bronze_df = read_parquet(
+            f"{args.bronze_out}/{args.day}", FILE_BRONZE_PARQUET_NAME)
+        if bronze_df is None:
+            print(f"[ERROR] Falta BRONCE: {args.bronze_out}/{args.day}/{FILE_BRONZE_PARQUET_NAME} "
+                  "(ejecuta antes `run.py bronze`)", file=sys.stderr)
+            sys.exit(2)
+        bronze_df = decode_raw_columns(bronze_df)
 
-    # ---- ORO: materializar events_gold.parquet ----
-    events_gold_df = build_events_gold(silver, session_timeout_min=30)
-    write_parquet(events_gold_df, f"{args.gold}/{args.day}", FILE_GOLD_NAME)
+    silver = to_silver(bronze_df, day=args.day,
+                       quarantine_dir=args.quarantine, writer=writer)
+    write_parquet(silver,  f"{args.silver}/{args.day}",
+                  FILE_SILVER_NAME, writer=writer)
     print(
-        f"[OK] ORO (events) materializado → {args.gold}/{args.day}/{FILE_GOLD_NAME}")
+        f"[OK] PLATA generada ({write_status(writer)}) → {args.silver}/{args.day}/{FILE_SILVER_NAME}")
+    return silver
+
+
+def run_gold(args, silver=None, writer=None):
+    """ORO: materializa events_gold.parquet + índice por usuario (y sketches si --sketches)."""
+    from ETL.gold import (
+        build_events_gold, build_gold_sketches, build_user_index, sketches_to_dict
+    )
+    from utils.files import read_parquet, write_json, write_parquet
+
+    if silver is None:
+        silver = read_parquet(f"{args.silver}/{args.day}", FILE_SILVER_NAME)
+        if silver is None:
+            print(f"[ERROR] Falta PLATA: {args.silver}/{args.day}/{FILE_SILVER_NAME} "
+                  "(ejecuta antes `run.py silver`)", file=sys.stderr)
+            sys.exit(2)
+
+    events_gold_df = build_events_gold(
+        silver, session_timeout_min=SESSION_TIMEOUT_MIN)
+    write_parquet(events_gold_df, f"{args.gold}/{args.day}",
+                  FILE_GOLD_NAME, writer=writer, row_group_size=GOLD_ROW_GROUP_SIZE)
+    print(
+        f"[OK] ORO (events) generado ({write_status(writer)}) → {args.gold}/{args.day}/{FILE_GOLD_NAME}")
+
+    # Índice por usuario: mismas posiciones de fila que events_gold.parquet (ordenado por user_id)
+    write_parquet(build_user_index(events_gold_df), f"{args.gold}/{args.day}",
+                  FILE_GOLD_USER_INDEX_NAME, writer=writer, row_group_size=GOLD_ROW_GROUP_SIZE)
+    print(
+        f"[OK] ORO (índice usuarios, {write_status(writer)}) → {args.gold}/{args.day}/{FILE_GOLD_USER_INDEX_NAME}")
+
+    if args.sketches:
+        sketches = build_gold_sketches(
+            events_gold_df, hll_p=SKETCH_HLL_P, top_k=SKETCH_TOP_K)
+        write_json(f"{args.gold}/{args.day}", FILE_SKETCHES_NAME,
+                   sketches_to_dict(sketches))
+        print(
+            f"[OK] ORO (sketches) → {args.gold}/{args.day}/{FILE_SKETCHES_NAME}")
+    return events_gold_df
 
-    # ---- ORO: cargar desde events_gold.parquet y calcular KPI ----
-    events_gold_path = f"{args.gold}/{args.day}/{FILE_GOLD_NAME}"
-    events_gold_loaded = pd.read_parquet(events_gold_path)
+
+def run_report(args, writer=None):
+    """Reporte: releído desde events_gold.parquet (fuente de verdad)."""
+    from ETL.gold import (
+        aggregate_from_events_gold, build_gold_sketches, sketches_from_dict
+    )
+    from report import build_report_md
+    from utils.files import count_parquet_rows, read_json, read_parquet, write_file
+
+    events_gold_loaded = read_parquet(f"{args.gold}/{args.day}", FILE_GOLD_NAME)
+    if events_gold_loaded is None:
+        print(f"[ERROR] Falta ORO: {args.gold}/{args.day}/{FILE_GOLD_NAME} "
+              "(ejecuta antes `run.py gold`)", file=sys.stderr)
+        sys.exit(2)
 
     (sessions,
      users_stats,
@@ -56,15 +119,101 @@ def main():
      sessions_per_day,
      funnel) = aggregate_from_events_gold(events_gold_loaded)
 
-    # ---- Reporte Markdown ----
-    report_md = build_report_md(args, bronze_df, bad_df, events_gold_df,
+    sketches, sketch_rebuilt = None, False
+    if args.sketches:
+        data = read_json(f"{args.gold}/{args.day}", FILE_SKETCHES_NAME)
+        if data:
+            sketches = sketches_from_dict(data)
+        else:
+            print(f"[WARN] Sin sketches para {args.day}: reconstruido desde "
+                  f"{args.gold}/{args.day}/{FILE_GOLD_NAME}")
+            sketches = build_gold_sketches(
+                events_gold_loaded, hll_p=SKETCH_HLL_P, top_k=SKETCH_TOP_K)
+            sketch_rebuilt = True
+
+    # Conteos de BRONCE desde metadatos Parquet: no hace falta leer los datos
+    bronze_rows = count_parquet_rows(
+        f"{args.bronze_out}/{args.day}", FILE_BRONZE_PARQUET_NAME)
+    if bronze_rows is None:
+        print(f"[WARN] Falta {args.bronze_out}/{args.day}/{FILE_BRONZE_PARQUET_NAME}: "
+              "filas BRONCE y cobertura sin dato en el reporte")
+    # Sin fichero de líneas rotas = no hubo ninguna (solo se escribe si hay)
+    bad_json_rows = count_parquet_rows(
+        f"{args.quarantine}/{args.day}", FILE_BAD_JSON_NAME) or 0
+
+    report_md = build_report_md(args, bronze_rows, bad_json_rows, events_gold_loaded,
                                 sessions, users_stats, top_paths, device_usage,
-                                sessions_per_day, funnel)
+                                sessions_per_day, funnel, sketches=sketches,
+                                sketch_rebuilt=sketch_rebuilt)
 
     write_file(args.report, f"{args.day}-reporte.md", report_md)
     print("[OK] Reporte Markdown generado")
+
+
+def run_all(args, writer=None):
+    # Las escrituras de BRONCE/PLATA/ORO se solapan con el cómputo de la etapa siguiente;
+    # el reporte relee ORO desde Parquet, así que antes hay que esperar a que esté en disco.
+    bronze_df = run_bronze(args, writer=writer)
+    silver = run_silver(args, bronze_df, writer=writer)
+    run_gold(args, silver, writer=writer)
+    if writer is not None:
+        print(f"[OK] {writer.flush()} ficheros Parquet escritos en disco")
+    run_report(args)
     print("[OK] Pipeline BRONCE→PLATA→ORO completado")
 
 
+RUNNERS = {
+    "bronze": run_bronze,
+    "silver": run_silver,
+    "gold": run_gold,
+    "report": run_report,
+    "all": run_all,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--day", default=DAY)
+    common.add_argument("--bronze", default=BRONZE_DIR)
+    common.add_argument("--bronze-file-name", default=FILE_BRONZE_NAME)
+    common.add_argument("--bronze-out", default=BRONZE_OUT_DIR)
+    common.add_argument("--silver", default=SILVER_DIR)
+    common.add_argument("--gold", default=GOLD_DIR)
+    common.add_argument("--report", default=REPORT_DIR)
+    common.add_argument("--quarantine", default=QUARANTINE_DIR)
+    common.add_argument("--sketches", action="store_true",
+                        help="Escribe sketches HLL/Space-Saving junto al ORO y los muestra en el reporte")
+
+    ap = argparse.ArgumentParser(
+        description="BRONCE→PLATA→ORO + Reporte Markdown (simple)")
+    sub = ap.add_subparsers(dest="stage", metavar="{" + ",".join(STAGES) + "}")
+    sub.add_parser("bronze", parents=[common], help="NDJSON → BRONCE")
+    sub.add_parser("silver", parents=[common], help="BRONCE → PLATA")
+    sub.add_parser("gold", parents=[common], help="PLATA → ORO")
+    sub.add_parser("report", parents=[common], help="ORO → reporte.md")
+    sub.add_parser("all", parents=[common], help="Pipeline completo (por defecto)")
+    return ap
+
+
+def main(argv: list[str] | None = None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Sin subcomando → `all` (compatibilidad con `python run.py --day ...`)
+    if not argv or (argv[0] not in STAGES and argv[0] not in ("-h", "--help")):
+        argv = ["all", *argv]
+    args = build_parser().parse_args(argv)
+
+    from utils.writer import OutputWriteError, OutputWriter
+    try:
+        with OutputWriter(max_workers=WRITER_THREADS) as writer:
+            RUNNERS[args.stage](args, writer=writer)
+            written = writer.flush()
+            if written:
+                print(f"[OK] {written} ficheros Parquet escritos en disco")
+    except OutputWriteError as e:
+        for path, exc in e.failures:
+            print(f"[ERROR] No se pudo escribir {path}: {exc!r}", file=sys.stderr)
+        sys.exit(2)
+
+
 if __name__ == "__main__":
     main()
@@ -1,12 +1,19 @@
+from __future__ import annotations
 
+import json
 import os
 from pathlib import Path
 import sys
-from typing import Iterable
-import pandas as pd
+import threading
+from typing import TYPE_CHECKING, Iterable
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from utils.writer import OutputWriter
+
+# pandas/pyarrow se importan dentro de cada función: este módulo lo usan todas las etapas
 DATA = Path(__file__).resolve().parents[2]
-DATA.mkdir(parents=True, exist_ok=True)
 
 
 def make_path_dirs(path_dirs: str):
@@ -19,9 +26,73 @@ def ensure_dir(path_dirs: str, file_name: str) -> str:
     return os.path.join(out_dir, file_name)
 
 
-def write_parquet(df: pd.DataFrame, path_dir: str, file_name: str):
-    out_path = ensure_dir(path_dir, file_name)
-    df.to_parquet(out_path, index=False, engine="pyarrow")
+def write_parquet_atomic(df: pd.DataFrame, out_path: str, row_group_size: int | None = None):
+    """Escribe en un temporal del mismo directorio y lo renombra: nunca queda un Parquet a medias."""
+    tmp_path = f"{out_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        df.to_parquet(tmp_path, index=False, engine="pyarrow",
+                      row_group_size=row_group_size)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_parquet(df: pd.DataFrame, path_dir: str, file_name: str, writer: OutputWriter | None = None,
+                  row_group_size: int | None = None):
+    """Escritura atómica; con `writer` se encola en su pool y se devuelve el Future."""
+    if writer is not None:
+        return writer.submit(df, path_dir, file_name, row_group_size=row_group_size)
+    write_parquet_atomic(df, ensure_dir(path_dir, file_name), row_group_size)
+
+
+def read_parquet(path_dir: str, file_name: str, columns: list[str] | None = None,
+                 filters: list[tuple] | None = None) -> pd.DataFrame | None:
+    """Lee solo `columns` (y las filas que pasan `filters`) del Parquet; None si el fichero no existe."""
+    in_path = make_path_dirs(path_dir) / file_name
+    if not in_path.is_file():
+        return None
+    import pandas as pd
+    return pd.read_parquet(in_path, columns=columns, filters=filters, engine="pyarrow")
+
+
+def count_parquet_rows(path_dir: str, file_name: str) -> int | None:
+    """Nº de filas desde los metadatos del Parquet (sin leer datos); None si no existe."""
+    in_path = make_path_dirs(path_dir) / file_name
+    if not in_path.is_file():
+        return None
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(in_path).metadata.num_rows
+
+
+def read_parquet_rows(path_dir: str, file_name: str, row_start: int, row_end: int,
+                      columns: list[str] | None = None) -> pd.DataFrame | None:
+    """
+    Lee las filas [row_start, row_end) abriendo solo los row groups que las contienen.
+    Devuelve None si el fichero no existe.
+    """
+    in_path = make_path_dirs(path_dir) / file_name
+    if not in_path.is_file():
+        return None
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(in_path)
+    meta = pf.metadata
+    if row_end > meta.num_rows:
+        raise ValueError(
+            f"{in_path}: filas [{row_start}, {row_end}) fuera del fichero ({meta.num_rows} filas)")
+    row_groups, first_offset, offset = [], None, 0
+    for rg in range(meta.num_row_groups):
+        rg_rows = meta.row_group(rg).num_rows
+        if offset < row_end and offset + rg_rows > row_start:
+            row_groups.append(rg)
+            first_offset = offset if first_offset is None else first_offset
+        offset += rg_rows
+    if not row_groups:
+        return pf.schema_arrow.empty_table().select(columns or pf.schema_arrow.names).to_pandas()
+    table = pf.read_row_groups(row_groups, columns=columns)
+    return table.slice(row_start - first_offset, row_end - row_start).to_pandas()
 
 
 def write_file(path_dirs: str, file_name: str, content: str):
@@ -30,6 +101,19 @@ def write_file(path_dirs: str, file_name: str, content: str):
         fh.write(content)
 
 
+def write_json(path_dirs: str, file_name: str, content: dict):
+    write_file(path_dirs, file_name, json.dumps(content, ensure_ascii=False))
+
+
+def read_json(path_dir: str, file_name: str) -> dict | None:
+    """Lee un JSON; devuelve None si el fichero no existe."""
+    in_path = make_path_dirs(path_dir) / file_name
+    if not in_path.is_file():
+        return None
+    with open(in_path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
 def iter_lines(path: str) -> Iterable[str]:
     if not os.path.isfile(path):
         print(
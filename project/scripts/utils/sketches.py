@@ -0,0 +1,157 @@
+# utils/sketches.py · sketches aproximados y fusionables entre días
+import base64
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def hash64(values: pd.Series) -> np.ndarray:
+    """Hash estable de 64 bits por valor (mismo valor → mismo hash en cualquier día)."""
+    values = values.dropna().astype("string")
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+def bit_length(w: np.ndarray) -> np.ndarray:
+    """int.bit_length() vectorizado y exacto para uint64."""
+    w = w.copy()
+    bl = np.zeros(len(w), dtype=np.uint8)
+    for s in (32, 16, 8, 4, 2, 1):
+        mask = w >= np.uint64(1 << s)
+        bl[mask] += s
+        w[mask] >>= np.uint64(s)
+    bl += (w > 0).astype(np.uint8)
+    return bl
+
+
+class HyperLogLog:
+    """
+    HyperLogLog con 2^p registros (p=12 → 4 KB, error relativo ≈ 1.6%).
+    Dos HLL con el mismo p se fusionan con el máximo por registro.
+    """
+
+    def __init__(self, p: int = 12, registers: np.ndarray | None = None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = (registers if registers is not None
+                          else np.zeros(self.m, dtype=np.uint8))
+
+    def update(self, values: pd.Series) -> "HyperLogLog":
+        h = hash64(values)
+        if len(h) == 0:
+            return self
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        w = h & np.uint64((1 << (64 - self.p)) - 1)
+        rho = (64 - self.p) - bit_length(w) + 1
+        np.maximum.at(self.registers, idx, rho.astype(np.uint8))
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.p != self.p:
+            raise ValueError(
+                f"No se pueden fusionar HLL con p distinto ({self.p} vs {other.p})")
+        self.registers = np.maximum(self.registers, other.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / \
+            float(np.sum(np.power(2.0, -self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Corrección de rango bajo (linear counting)
+            return m * math.log(m / zeros)
+        return raw
+
+    @property
+    def relative_error(self) -> float:
+        """Error estándar relativo (1σ) = 1.04 / sqrt(m)."""
+        return 1.04 / math.sqrt(self.m)
+
+    def to_dict(self) -> dict:
+        return {"p": self.p,
+                "registers": base64.b64encode(self.registers.tobytes()).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HyperLogLog":
+        registers = np.frombuffer(base64.b64decode(
+            data["registers"]), dtype=np.uint8).copy()
+        return cls(p=int(data["p"]), registers=registers)
+
+
+class SpaceSaving:
+    """
+    Space-Saving (top-k) con como mucho `k` contadores.
+    Cada contador sobreestima: count - error <= real <= count.
+    """
+
+    def __init__(self, k: int = 64, counters: dict | None = None, total: int = 0):
+        self.k = k
+        self.counters: dict[str, list[int]] = counters or {}  # item → [count, error]
+        self.total = total
+
+    def min_count(self) -> int:
+        if len(self.counters) < self.k:
+            return 0
+        return min(c for c, _ in self.counters.values())
+
+    def update(self, values: pd.Series) -> "SpaceSaving":
+        """
+        Resumen de un lote (p. ej. un día): los k más frecuentes con conteo exacto (error 0).
+        Cualquier valor fuera del resumen tiene <= min_count(), que es la cota que usa merge().
+        """
+        vc = values.dropna().astype("string").value_counts()
+        batch = SpaceSaving(self.k, total=int(vc.sum()),
+                            counters={str(item): [int(c), 0] for item, c in vc.head(self.k).items()})
+        if not self.counters and not self.total:
+            self.counters, self.total = batch.counters, batch.total
+            return self
+        return self.merge(batch)
+
+    def add(self, item: str, w: int = 1):
+        """Actualización en streaming (un item); para lotes usar update()."""
+        self.total += w
+        if item in self.counters:
+            self.counters[item][0] += w
+        elif len(self.counters) < self.k:
+            self.counters[item] = [w, 0]
+        else:
+            victim = min(self.counters, key=lambda x: self.counters[x][0])
+            floor = self.counters.pop(victim)[0]
+            self.counters[item] = [floor + w, floor]
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Fusión con cota superior: un item ausente en un resumen pudo tener hasta su min_count."""
+        m1, m2 = self.min_count(), other.min_count()
+        merged: dict[str, list[int]] = {}
+        for item in set(self.counters) | set(other.counters):
+            c1, e1 = self.counters.get(item, (m1, m1))
+            c2, e2 = other.counters.get(item, (m2, m2))
+            merged[item] = [c1 + c2, e1 + e2]
+        top = sorted(merged.items(), key=lambda kv: kv[1][0], reverse=True)
+        self.k = max(self.k, other.k)
+        self.counters = dict(top[:self.k])
+        self.total += other.total
+        return self
+
+    def top(self, n: int = 10) -> pd.DataFrame:
+        rows = sorted(self.counters.items(),
+                      key=lambda kv: kv[1][0], reverse=True)[:n]
+        return pd.DataFrame(
+            [{"path": item, "views_est": c, "error_max": e, "views_min": c - e}
+             for item, (c, e) in rows],
+            columns=["path", "views_est", "error_max", "views_min"])
+
+    @property
+    def max_error(self) -> int:
+        """Cota para cualquier item fuera del resumen: min_count() (0 si el resumen es exacto)."""
+        return self.min_count()
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "total": self.total, "counters": self.counters}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SpaceSaving":
+        return cls(k=int(data["k"]), total=int(data["total"]),
+                   counters={k: list(v) for k, v in data["counters"].items()})
@@ -0,0 +1,75 @@
+# utils/writer.py · escrituras Parquet en segundo plano (pool de hilos)
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from utils.files import ensure_dir, write_parquet_atomic
+
+
+class OutputWriteError(RuntimeError):
+    """Una o más escrituras encoladas fallaron; `failures` = [(ruta, excepción)]."""
+
+    def __init__(self, failures: list[tuple[str, BaseException]]):
+        self.failures = failures
+        detail = "; ".join(f"{path}: {exc!r}" for path, exc in failures)
+        super().__init__(f"{len(failures)} escritura(s) fallida(s): {detail}")
+
+
+class OutputWriter:
+    """
+    Pool de hilos para escribir Parquet mientras sigue el cómputo de la etapa siguiente.
+    pyarrow libera el GIL al comprimir/escribir, así que los hilos solapan de verdad.
+
+        with OutputWriter() as writer:
+            write_parquet(df, "output/silver/<día>", "events_silver.parquet", writer=writer)
+            ...
+            writer.flush()   # espera y lanza OutputWriteError si algo falló
+
+    Cada escritura es atómica (temporal + rename). El DataFrame no debe modificarse
+    después de encolarlo.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="parquet-writer")
+        self._pending: list[tuple[str, Future]] = []
+
+    def submit(self, df, path_dir: str, file_name: str, row_group_size: int | None = None) -> Future:
+        out_path = ensure_dir(path_dir, file_name)
+        future = self._pool.submit(
+            write_parquet_atomic, df, out_path, row_group_size)
+        self._pending.append((out_path, future))
+        return future
+
+    def flush(self) -> int:
+        """
+        Espera a todas las escrituras pendientes y devuelve cuántas se completaron;
+        lanza OutputWriteError con todas las que fallaron.
+        """
+        pending, self._pending = self._pending, []
+        failures = []
+        for out_path, future in pending:
+            exc = future.exception()
+            if exc is not None:
+                failures.append((out_path, exc))
+        if failures:
+            raise OutputWriteError(failures)
+        return len(pending)
+
+    def close(self):
+        self.flush()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return False
+        # Ya hay un error en curso: esperar a las escrituras sin taparlo
+        try:
+            self.flush()
+        except OutputWriteError as write_exc:
+            print(f"[ERROR] {write_exc}", file=sys.stderr)
+        self._pool.shutdown(wait=True)
+        return False
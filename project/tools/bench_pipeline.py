@@ -0,0 +1,72 @@
+"""Benchmark de arranque y de etapas del CLI `scripts/run.py`.
+
+Cada medida es un proceso nuevo (como en las ejecuciones por drop), así el
+tiempo de importación cuenta. Resultados: tabla en consola y una línea JSON
+por ejecución en `output/benchmarks/bench.jsonl` para seguir la evolución.
+
+    python tools/bench_pipeline.py --day 2025-11-10 --runs 5
+"""
+import argparse
+import datetime
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parents[1]
+RUN = BASE / "scripts" / "run.py"
+OUT = BASE / "output" / "benchmarks" / "bench.jsonl"
+
+
+def time_cmd(cmd: list[str], runs: int) -> list[float]:
+	"""Tiempos de pared (ms) de `runs` ejecuciones de `cmd` desde `project/`."""
+	times = []
+	for _ in range(runs):
+		t0 = time.perf_counter()
+		subprocess.run(cmd, cwd=BASE, check=True,
+		               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+		times.append((time.perf_counter() - t0) * 1000.0)
+	return times
+
+
+def main():
+	ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	ap.add_argument("--day", required=True,
+	                help="Día con NDJSON en data/drops/<día>/")
+	ap.add_argument("--runs", type=int, default=5)
+	args = ap.parse_args()
+
+	py = sys.executable
+	cases = {
+		"python (vacío)": [py, "-c", "pass"],
+		"startup (run.py --help)": [py, str(RUN), "--help"],
+	}
+	# Orden de etapas: cada una necesita la salida de la anterior
+	for stage in ("bronze", "silver", "gold", "report"):
+		cases[f"stage {stage}"] = [py, str(RUN), stage, "--day", args.day]
+
+	results = {}
+	for name, cmd in cases.items():
+		t = time_cmd(cmd, args.runs)
+		results[name] = {"median_ms": statistics.median(t), "min_ms": min(t)}
+
+	print("| benchmark | mediana (ms) | mín (ms) |")
+	print("|:--|--:|--:|")
+	for name, r in results.items():
+		print(f"| {name} | {r['median_ms']:.1f} | {r['min_ms']:.1f} |")
+
+	OUT.parent.mkdir(parents=True, exist_ok=True)
+	with open(OUT, "a", encoding="utf-8") as fh:
+		fh.write(json.dumps({
+			"ts": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+			"day": args.day,
+			"runs": args.runs,
+			"results": results,
+		}, ensure_ascii=False) + "\n")
+	print(f"Guardado: {OUT}")
+
+
+if __name__ == '__main__':
+	main()